@@ -1,6 +1,6 @@
 import { app, BrowserWindow, ipcMain, dialog, protocol, shell } from 'electron'
 import { join } from 'path'
-import { spawn } from 'child_process'
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process'
 import * as fs from 'fs/promises'
 import { readFile } from 'fs/promises'
 import * as projectManager from './projectManager'
@@ -302,52 +302,97 @@ function registerIpcHandlers() {
     })
   })
 
-  // AI analysis handler (video understanding)
-  ipcMain.handle('ai:analyzeVideo', async (_, videoPath: string, audioPath: string) => {
-    return new Promise((resolve, reject) => {
-      const pythonScript = join(appRoot, 'python', 'video_analyzer.py')
-      // Use venv python
-      const pythonPath = join(appRoot, 'venv', 'bin', 'python')
+  // AI analysis (video understanding) runs in one long-lived `--serve` process,
+  // so Whisper and BLIP load once per session instead of once per video.
+  // It answers jobs one JSON line each, in the order they were written.
+  let analyzer: ChildProcessWithoutNullStreams | null = null
+  let pendingAnalyses: { resolve: (analysis: any) => void, reject: (err: Error) => void }[] = []
 
-      console.log('Analyzing video with:', { pythonPath, pythonScript, videoPath, audioPath })
+  const getVideoAnalyzer = () => {
+    if (analyzer) return analyzer
 
-      const python = spawn(pythonPath, [
-        pythonScript,
-        '--video', videoPath,
-        '--audio', audioPath
-      ])
+    const pythonScript = join(appRoot, 'python', 'video_analyzer.py')
+    // Use venv python
+    const pythonPath = join(appRoot, 'venv', 'bin', 'python')
 
-      let output = ''
-      let errorOutput = ''
+    console.log('Starting video analyzer:', { pythonPath, pythonScript })
 
-      python.stdout.on('data', (data) => {
-        output += data.toString()
-      })
+    const python = spawn(pythonPath, [pythonScript, '--serve'])
+    analyzer = python
 
-      python.stderr.on('data', (data) => {
-        errorOutput += data.toString()
-        console.error('Python stderr:', data.toString())
-      })
+    let stdoutBuffer = ''
+    // Recent stderr only, to explain a crash without growing for the whole session
+    let errorTail = ''
 
-      python.on('close', (code) => {
-        if (code === 0) {
-          try {
-            const analysis = JSON.parse(output)
-            resolve(analysis)
-          } catch (err) {
-            console.error('Failed to parse JSON:', output)
-            reject(new Error(`Failed to parse analysis results: ${err}`))
-          }
+    python.stdout.on('data', (data) => {
+      stdoutBuffer += data.toString()
+      let newline: number
+      while ((newline = stdoutBuffer.indexOf('\n')) !== -1) {
+        const line = stdoutBuffer.slice(0, newline).trim()
+        stdoutBuffer = stdoutBuffer.slice(newline + 1)
+        if (!line) continue
+
+        let result: any
+        try {
+          result = JSON.parse(line)
+        } catch (err) {
+          // Stray library output, not a job result
+          console.error('Ignoring non-JSON analyzer output:', line)
+          continue
+        }
+
+        const job = pendingAnalyses.shift()
+        if (!job) continue
+        if (result.error) {
+          console.error('Video analysis failed:', result.error)
+          job.reject(new Error(`Video analysis failed: ${result.error}`))
         } else {
-          console.error('Video analysis failed:', errorOutput)
-          reject(new Error(`Video analysis failed with code ${code}: ${errorOutput}`))
+          job.resolve(result)
         }
-      })
+      }
+    })
 
-      python.on('error', (err) => {
-        console.error('Failed to spawn python:', err)
-        reject(err)
-      })
+    python.stderr.on('data', (data) => {
+      errorTail = (errorTail + data.toString()).slice(-4000)
+      console.error('Python stderr:', data.toString())
+    })
+
+    const failPending = (err: Error) => {
+      if (analyzer === python) analyzer = null
+      const jobs = pendingAnalyses
+      pendingAnalyses = []
+      jobs.forEach((job) => job.reject(err))
+    }
+
+    // Writing a job after the process died reports EPIPE here; 'close' rejects the job
+    python.stdin.on('error', (err) => {
+      console.error('Video analyzer stdin error:', err)
+    })
+
+    python.on('close', (code) => {
+      console.error('Video analyzer exited:', code)
+      failPending(new Error(`Video analysis failed with code ${code}: ${errorTail}`))
+    })
+
+    python.on('error', (err) => {
+      console.error('Failed to spawn python:', err)
+      failPending(err)
+    })
+
+    return python
+  }
+
+  app.on('will-quit', () => {
+    analyzer?.kill()
+  })
+
+  ipcMain.handle('ai:analyzeVideo', async (_, videoPath: string, audioPath: string) => {
+    return new Promise((resolve, reject) => {
+      console.log('Analyzing video:', { videoPath, audioPath })
+
+      const python = getVideoAnalyzer()
+      pendingAnalyses.push({ resolve, reject })
+      python.stdin.write(JSON.stringify({ video: videoPath, audio: audioPath }) + '\n')
     })
   })
 
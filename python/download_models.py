@@ -37,11 +37,14 @@ def download_whisper_models():
     print("Downloading Whisper models...")
 
     try:
-        import whisper
-
         # Download base model (good balance of speed and accuracy)
         print("Loading Whisper base model...")
-        model = whisper.load_model("base")
+        try:
+            from faster_whisper import WhisperModel
+            model = WhisperModel("base", device="cpu", compute_type="int8")
+        except ImportError:
+            import whisper
+            model = whisper.load_model("base")
         print("✓ Whisper base model downloaded successfully")
 
         # Clean up memory
@@ -6,43 +6,289 @@ identify actions, and suggest contextual sound effects.
 """
 
 import argparse
+import bisect
+import contextlib
+import functools
 import json
+import math
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 try:
-    import whisper
     import cv2
     import numpy as np
     import torch
+    import torch.nn.functional as F
     from transformers import BlipProcessor, BlipForConditionalGeneration
     from PIL import Image
 except ImportError as e:
     print(f"Error: Required packages not installed: {e}", file=sys.stderr)
-    print("pip install openai-whisper opencv-python numpy torch transformers pillow", file=sys.stderr)
+    print("pip install faster-whisper opencv-python numpy torch transformers pillow", file=sys.stderr)
     sys.exit(1)
 
-# Initialize vision-language model for dynamic understanding (lazy loading)
+# Prefer the CTranslate2 Whisper runtime (quantized kernels), fall back to openai-whisper
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+    try:
+        import whisper
+    except ImportError as e:
+        print(f"Error: Required packages not installed: {e}", file=sys.stderr)
+        print("pip install faster-whisper (or openai-whisper)", file=sys.stderr)
+        sys.exit(1)
+
+# Optional: batched VAD-chunk decoding, added in faster-whisper 1.1
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
+# Optional: TensorRT backend for compiling the BLIP vision encoder
+try:
+    import torch_tensorrt  # Registers the "tensorrt" torch.compile backend
+except ImportError:
+    torch_tensorrt = None
+
+# Optional: PyAV decoding (frame-threaded, NVDEC) instead of OpenCV's read loop
+try:
+    import av
+except ImportError:
+    av = None
+
+# Optional: NVDEC hardware decoding, added in PyAV 14.1
+try:
+    from av.codec.hwaccel import HWAccel
+except ImportError:
+    HWAccel = None
+
+# Optional: Aho-Corasick automaton for single-pass keyword scanning
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Resolved once at import instead of querying the CUDA runtime per frame
+_DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# Initialize models for dynamic understanding (lazy loading)
+_whisper_model = None
 _vlm_model = None
 _vlm_processor = None
+_vlm_dtype = torch.float32  # Precision BLIP runs at, resolved when it loads
+_vlm_eager = None  # Original BLIP submodules while compiled ones are in use
+
+# Reused page-locked staging buffer for frame uploads to the GPU
+_pinned_buffer = None
+_pinned_upload_done = None
+
+# BLIP normalization constants as device tensors, shaped for NCHW broadcasting
+_pixel_mean_std = None
+
+# Prompted caption generated for every keyframe
+ACTION_PROMPT = "What is happening in this image?"
+
+# Shot-change keyframe sampling: candidates are checked every KEYFRAME_CHECK_INTERVAL
+# seconds and captioned when their 64x64 grayscale thumbnail differs from the last
+# keyframe's by more than SHOT_CHANGE_THRESHOLD (mean absolute 0-255 levels), spaced
+# at least KEYFRAME_MIN_GAP and at most KEYFRAME_MAX_GAP seconds apart
+KEYFRAME_CHECK_INTERVAL = 0.5
+SHOT_CHANGE_THRESHOLD = 25.0
+KEYFRAME_MIN_GAP = 1.0
+KEYFRAME_MAX_GAP = 5.0
 
-def get_vlm_model():
-    """Lazy load vision-language model for image captioning and understanding."""
-    global _vlm_model, _vlm_processor
+# Keyframes captioned per BLIP generate call
+VLM_BATCH_SIZE = 8
+
+# Speech chunks decoded together per Whisper batch
+WHISPER_BATCH_SIZE = 8
+
+
+def get_whisper_model():
+    """Lazy load Whisper model once and reuse it across transcriptions."""
+    global _whisper_model
+    if _whisper_model is None:
+        # base is good balance of speed/accuracy
+        # Options: 'tiny', 'base', 'small', 'medium', 'large'
+        if WhisperModel is not None:
+            device = _DEVICE.type
+            compute_type = "int8_float16" if device == "cuda" else "int8"
+            # With a second GPU, keep ASR off the one BLIP uses (cuda:0)
+            device_index = 1 if torch.cuda.device_count() > 1 else 0
+            _whisper_model = WhisperModel("base", device=device, device_index=device_index,
+                                          compute_type=compute_type)
+            # Batched pipeline splits speech with Silero VAD into <=30s chunks
+            # and decodes them in parallel rather than one sequential pass
+            if BatchedInferencePipeline is not None:
+                _whisper_model = BatchedInferencePipeline(_whisper_model)
+            else:
+                print("faster-whisper < 1.1, decoding speech chunks sequentially", file=sys.stderr)
+        else:
+            print("faster-whisper not installed, using openai-whisper", file=sys.stderr)
+            _whisper_model = whisper.load_model("base")
+    return _whisper_model
+
+
+def get_vlm_model(compile_model: bool = False):
+    """
+    Lazy load vision-language model for image captioning and understanding.
+
+    Args:
+        compile_model: Compile BLIP on CUDA when it loads. Only worth it in a
+            long-lived process (serve mode); a one-shot run would spend more
+            on compilation than it saves on a single video.
+    """
+    global _vlm_model, _vlm_processor, _vlm_dtype
     if _vlm_model is None:
         print("Loading vision-language model for dynamic analysis...", file=sys.stderr)
         # Using BLIP-2 for image understanding and description
         _vlm_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
         _vlm_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
-        if torch.cuda.is_available():
-            _vlm_model = _vlm_model.to("cuda")
+        _vlm_model = _vlm_model.eval()
+        if _DEVICE.type == "cuda":
+            _vlm_model = _vlm_model.to(_DEVICE)
+            # FP16 halves weight bandwidth and runs matmuls on tensor cores (Volta+)
+            if torch.cuda.get_device_capability() >= (7, 0):
+                _vlm_dtype = torch.float16
+                _vlm_model = _vlm_model.half()
+        else:
+            # INT8 dynamic quantization of the Linear-heavy encoder/decoder on CPU
+            _vlm_model = torch.ao.quantization.quantize_dynamic(
+                _vlm_model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        if compile_model and _DEVICE.type == "cuda" and hasattr(torch, "compile"):
+            _compile_vlm(_vlm_model, _vlm_processor)
     return _vlm_model, _vlm_processor
 
 
+def _compile_vlm(model, processor):
+    """
+    Compile BLIP submodules and warm them up.
+
+    generate() calls the submodules directly, so they are compiled in place
+    rather than wrapping the whole model. The vision encoder only sees fixed
+    size images, so it is built as a TensorRT engine when torch_tensorrt is
+    installed, or as TorchInductor CUDA graphs otherwise.
+    """
+    global _vlm_eager
+    _vlm_eager = (model.vision_model, model.text_decoder.forward)
+    vision_model, text_forward = _vlm_eager
+    try:
+        if torch_tensorrt is not None:
+            model.vision_model = torch.compile(
+                vision_model, backend="tensorrt", options={"enabled_precisions": {_vlm_dtype}}
+            )
+        else:
+            model.vision_model = torch.compile(vision_model, mode="reduce-overhead", fullgraph=False)
+        model.text_decoder.forward = torch.compile(text_forward, dynamic=True)
+    except Exception as e:
+        _use_eager_vlm(model, e)
+        return
+
+    # Warm up through the real captioning path so the autocast, prompt mask and
+    # generate kwargs that keyframes use are what gets compiled
+    size = model.config.vision_config.image_size
+    dummy = np.zeros((size, size, 3), dtype=np.uint8)
+    analyze_frames_batch([dummy] * VLM_BATCH_SIZE, model, processor)
+
+
+def _use_eager_vlm(model, error: Exception):
+    """Swap the eager BLIP submodules back in after a compile failure."""
+    global _vlm_eager
+    print(f"torch.compile failed, using eager BLIP: {error}", file=sys.stderr)
+    model.vision_model, model.text_decoder.forward = _vlm_eager
+    _vlm_eager = None
+
+
+def _pinned_staging(shape: Tuple[int, ...], dtype):
+    """
+    Return a view of the reused pinned host buffer that is safe to overwrite.
+
+    Pinned memory allows a DMA copy that does not block the host, and reusing
+    one buffer avoids a page-locked allocation per batch.
+    """
+    global _pinned_buffer, _pinned_upload_done
+    if (_pinned_buffer is None or _pinned_buffer.dtype != dtype
+            or _pinned_buffer.shape[0] < shape[0] or tuple(_pinned_buffer.shape[1:]) != tuple(shape[1:])):
+        _pinned_buffer = torch.empty(shape, dtype=dtype, pin_memory=True)
+        _pinned_upload_done = torch.cuda.Event()
+    else:
+        # The previous upload must finish before the buffer is overwritten
+        _pinned_upload_done.synchronize()
+    return _pinned_buffer[:shape[0]]
+
+
+def _upload_staged(staging):
+    """Start an asynchronous copy of a pinned staging view to the GPU."""
+    device_tensor = staging.to(_DEVICE, non_blocking=True)
+    _pinned_upload_done.record()
+    return device_tensor
+
+
+def _stage_pixel_values(pixel_values):
+    """Upload processor pixel values to the GPU through the pinned buffer."""
+    staging = _pinned_staging(tuple(pixel_values.shape), _vlm_dtype)
+    staging.copy_(pixel_values)
+    return _upload_staged(staging)
+
+
+def _preprocess_frames_gpu(frames: List[np.ndarray], processor):
+    """
+    BLIP image preprocessing on the GPU for same-sized BGR frames.
+
+    The raw uint8 frames are uploaded through the pinned buffer, then channel
+    reorder, resize, rescale and normalization run as a few CUDA kernels
+    instead of a PIL resize and normalize per frame on the CPU.
+    """
+    global _pixel_mean_std
+    image_processor = processor.image_processor
+    if _pixel_mean_std is None:
+        _pixel_mean_std = tuple(
+            torch.tensor(stats, dtype=torch.float32, device=_DEVICE).view(1, 3, 1, 1)
+            for stats in (image_processor.image_mean, image_processor.image_std)
+        )
+    mean, std = _pixel_mean_std
+
+    staging = _pinned_staging((len(frames),) + frames[0].shape, torch.uint8)
+    for i, frame in enumerate(frames):
+        staging[i].copy_(torch.from_numpy(frame))
+    frames_u8 = _upload_staged(staging)
+
+    size = image_processor.size
+    pixels = torch.empty((len(frames), 3, size['height'], size['width']), dtype=_vlm_dtype, device=_DEVICE)
+    # Convert and resize one frame at a time, so the float copy of the
+    # full-resolution source never exists for the whole batch at once
+    for i in range(len(frames)):
+        # BGR -> RGB, HWC -> CHW
+        frame = frames_u8[i:i + 1].flip(-1).permute(0, 3, 1, 2).float()
+        # Antialiased bicubic matches the processor's PIL resize; round to uint8 levels like PIL
+        frame = F.interpolate(frame, size=(size['height'], size['width']),
+                              mode='bicubic', align_corners=False, antialias=True)
+        frame = frame.clamp_(0, 255).round_()
+        pixels[i:i + 1] = frame.mul_(image_processor.rescale_factor).sub_(mean).div_(std)
+    return pixels
+
+
+def _prepare_vlm_inputs(inputs) -> Dict[str, Any]:
+    """Move processor outputs to the model device, with pixels at the model's precision."""
+    if _DEVICE.type == "cuda":
+        inputs = {k: _stage_pixel_values(v) if k == 'pixel_values' else v.to(_DEVICE)
+                  for k, v in inputs.items()}
+    return inputs
+
+
+@functools.lru_cache(maxsize=None)
+def _tokenized_prompt(processor, prompt: str) -> Dict[str, Any]:
+    """Tokenize a fixed prompt once and keep it on the model device, shape (1, L)."""
+    return _prepare_vlm_inputs(processor(text=prompt, return_tensors="pt"))
+
+
 def transcribe_audio(audio_path: str):
     """
-    Transcribe audio using OpenAI Whisper.
+    Transcribe audio using Whisper (faster-whisper when available).
 
     Args:
         audio_path: Path to audio file
@@ -51,27 +297,51 @@ def transcribe_audio(audio_path: str):
         List of transcription segments
     """
     try:
-        # Load Whisper model (base is good balance of speed/accuracy)
-        # Options: 'tiny', 'base', 'small', 'medium', 'large'
-        model = whisper.load_model("base")
-
-        # Transcribe
-        result = model.transcribe(
-            audio_path,
-            language='en',
-            task='transcribe',
-            verbose=False
-        )
+        model = get_whisper_model()
 
-        # Format segments
         transcription = []
-        for segment in result['segments']:
-            transcription.append({
-                'text': segment['text'].strip(),
-                'start': segment['start'],
-                'end': segment['end'],
-                'confidence': segment.get('confidence', 0.9)
-            })
+        if WhisperModel is not None:
+            # Greedy decoding; VAD filter skips silent stretches entirely.
+            # Not conditioning on previous text also stops hallucination loops.
+            # Timestamps stay on so segments keep sentence-level timing for SFX placement.
+            batch_kwargs = {'batch_size': WHISPER_BATCH_SIZE} if BatchedInferencePipeline is not None else {}
+            segments, _ = model.transcribe(
+                audio_path,
+                language='en',
+                beam_size=1,
+                vad_filter=True,
+                condition_on_previous_text=False,
+                without_timestamps=False,
+                **batch_kwargs
+            )
+
+            for segment in segments:
+                transcription.append({
+                    'text': segment.text.strip(),
+                    'start': segment.start,
+                    'end': segment.end,
+                    'confidence': math.exp(segment.avg_logprob)
+                })
+        else:
+            # Decode to a 16 kHz float waveform up front and hand over the array.
+            # The whole clip is kept; pad_or_trim would cut it to 30s.
+            audio = whisper.load_audio(audio_path)
+            result = model.transcribe(
+                audio,
+                language='en',
+                task='transcribe',
+                fp16=_DEVICE.type == "cuda",  # FP16 decoding is GPU-only
+                condition_on_previous_text=False,
+                verbose=False
+            )
+
+            for segment in result['segments']:
+                transcription.append({
+                    'text': segment['text'].strip(),
+                    'start': segment['start'],
+                    'end': segment['end'],
+                    'confidence': math.exp(segment['avg_logprob'])
+                })
 
         return transcription
 
@@ -80,6 +350,56 @@ def transcribe_audio(audio_path: str):
         return []
 
 
+def _generate_captions(model, pixel_values, prompt_inputs: List, **generate_kwargs) -> List:
+    """
+    Caption the same images under several prompts, running the vision encoder once.
+
+    Mirrors BlipForConditionalGeneration.generate, but shares the image
+    embeddings across the text-decoder calls instead of re-encoding per prompt.
+
+    Args:
+        model: BLIP captioning model
+        pixel_values: Preprocessed images on the model device
+        prompt_inputs: Tokenized prompts (input_ids/attention_mask), or None
+            for an unconditional caption
+        **generate_kwargs: Passed through to the text decoder's generate
+
+    Returns:
+        Generated token ids, one tensor per prompt
+    """
+    batch_size = pixel_values.shape[0]
+    if _vlm_eager is not None and batch_size < VLM_BATCH_SIZE:
+        # Compiled encoders are specialized per batch shape (TensorRT builds an
+        # engine for each), so pad short batches to the one shape warmed up
+        padding = pixel_values.new_zeros((VLM_BATCH_SIZE - batch_size,) + pixel_values.shape[1:])
+        pixel_values = torch.cat([pixel_values, padding])
+    image_embeds = model.vision_model(pixel_values=pixel_values)[0][:batch_size]
+    image_attention_mask = torch.ones(image_embeds.size()[:-1], dtype=torch.long, device=image_embeds.device)
+    text_config = model.config.text_config
+
+    outputs = []
+    for inputs in prompt_inputs:
+        if inputs is None:
+            input_ids = (torch.LongTensor([[model.decoder_input_ids, text_config.eos_token_id]])
+                         .repeat(batch_size, 1).to(image_embeds.device))
+            attention_mask = None
+        else:
+            input_ids = inputs['input_ids'].clone()
+            attention_mask = inputs['attention_mask'][:, :-1]
+        input_ids[:, 0] = text_config.bos_token_id
+
+        outputs.append(model.text_decoder.generate(
+            input_ids=input_ids[:, :-1],
+            eos_token_id=text_config.sep_token_id,
+            pad_token_id=text_config.pad_token_id,
+            attention_mask=attention_mask,
+            encoder_hidden_states=image_embeds,
+            encoder_attention_mask=image_attention_mask,
+            **generate_kwargs,
+        ))
+    return outputs
+
+
 def analyze_frame_content(frame: np.ndarray, model, processor) -> Dict[str, Any]:
     """
     Dynamically analyze frame content using vision-language model.
@@ -93,44 +413,153 @@ def analyze_frame_content(frame: np.ndarray, model, processor) -> Dict[str, Any]
     Returns:
         Dict with dynamic description and extracted semantic info
     """
-    # Convert BGR to RGB
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    pil_image = Image.fromarray(rgb_frame)
-
-    # Generate natural language caption of what's happening
-    inputs = processor(pil_image, return_tensors="pt")
-    if torch.cuda.is_available():
-        inputs = {k: v.to("cuda") for k, v in inputs.items()}
-
-    with torch.no_grad():
-        # Generate general description
-        out = model.generate(**inputs, max_length=50)
-        general_description = processor.decode(out[0], skip_special_tokens=True)
-
-        # Generate action-focused description
-        action_prompt = "What is happening in this image?"
-        action_inputs = processor(pil_image, action_prompt, return_tensors="pt")
-        if torch.cuda.is_available():
-            action_inputs = {k: v.to("cuda") for k, v in action_inputs.items()}
-
-        action_out = model.generate(**action_inputs, max_length=50)
-        action_description = processor.decode(action_out[0], skip_special_tokens=True)
-
-        # Generate sound-focused description
-        sound_prompt = "What sounds would you hear in this scene?"
-        sound_inputs = processor(pil_image, sound_prompt, return_tensors="pt")
-        if torch.cuda.is_available():
-            sound_inputs = {k: v.to("cuda") for k, v in sound_inputs.items()}
-
-        sound_out = model.generate(**sound_inputs, max_length=50)
-        sound_description = processor.decode(sound_out[0], skip_special_tokens=True)
-
-    return {
-        'description': general_description,
-        'action_description': action_description,
-        'sound_description': sound_description,
-        'confidence': 0.85  # BLIP is generally high quality
-    }
+    return analyze_frames_batch([frame], model, processor)[0]
+
+
+def analyze_frames_batch(frames: List[np.ndarray], model, processor) -> List[Dict[str, Any]]:
+    """
+    Analyze several frames at once with the vision-language model.
+
+    Each prompt is generated for the whole batch in a single call, which
+    amortizes kernel launches over the batch instead of captioning one
+    frame at a time.
+
+    Args:
+        frames: Video frames (BGR format from OpenCV)
+        model: Vision-language model
+        processor: Model processor
+
+    Returns:
+        One analysis dict per frame, in input order
+    """
+    # Preprocess the images once; only the text prompt differs between captions
+    if _DEVICE.type == "cuda" and len({frame.shape for frame in frames}) == 1:
+        pixel_values = _preprocess_frames_gpu(frames, processor)
+    else:
+        # Convert BGR to RGB
+        pil_images = [Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)) for frame in frames]
+        inputs = _prepare_vlm_inputs(processor(images=pil_images, return_tensors="pt"))
+        pixel_values = inputs['pixel_values']
+
+    # FP16 autocast when the model runs in half precision
+    autocast = (torch.autocast("cuda", dtype=torch.float16)
+                if _vlm_dtype == torch.float16 else contextlib.nullcontext())
+
+    # Action-focused prompt (same prompt for every frame, so the cached
+    # tokens are broadcast over the batch without padding)
+    action_inputs = {k: v.expand(len(frames), -1)
+                     for k, v in _tokenized_prompt(processor, ACTION_PROMPT).items()}
+
+    with torch.inference_mode(), autocast:
+        # General description (unconditional), then the action one.
+        # Greedy with the KV cache; captions only feed keyword matching, so
+        # 24 new tokens (not counting the prompt) is plenty
+        generate = functools.partial(
+            _generate_captions, model, pixel_values, [None, action_inputs],
+            max_new_tokens=24, num_beams=1, do_sample=False, use_cache=True
+        )
+        try:
+            out, action_out = generate()
+        except Exception as e:
+            # A new shape can recompile mid-video; retry that batch eagerly
+            if _vlm_eager is None:
+                raise
+            _use_eager_vlm(model, e)
+            out, action_out = generate()
+
+    general_descriptions = processor.batch_decode(out, skip_special_tokens=True)
+    action_descriptions = processor.batch_decode(action_out, skip_special_tokens=True)
+
+    # No sound-focused caption: convert_visual_to_audio_description infers
+    # the SFX from the visual and action captions when this is empty
+    return [
+        {
+            'description': general,
+            'action_description': action,
+            'sound_description': '',
+            'confidence': 0.85  # BLIP is generally high quality
+        }
+        for general, action in zip(general_descriptions, action_descriptions)
+    ]
+
+
+def _open_video_container(video_path: str):
+    """Open a video with PyAV, decoding on NVDEC when CUDA is available."""
+    if _DEVICE.type == "cuda" and HWAccel is not None:
+        try:
+            return av.open(video_path, hwaccel=HWAccel("cuda", allow_software_fallback=True))
+        except av.FFmpegError as e:
+            print(f"NVDEC unavailable, decoding on CPU: {e}", file=sys.stderr)
+    return av.open(video_path)
+
+
+def _iter_sampled_frames(video_path: str, sample_rate: int):
+    """
+    Yield (frame_idx, frame) for every sample_rate-th frame, in BGR format.
+
+    With PyAV, frames are decoded with FFmpeg frame threading (on NVDEC when
+    available) and only the sampled ones are converted to arrays. The OpenCV
+    fallback likewise only grab()s skipped frames and retrieve()s sampled ones.
+    """
+    if av is None:
+        cap = cv2.VideoCapture(video_path)
+        try:
+            frame_idx = 0
+            # grab() decodes without the color conversion and copy of retrieve();
+            # stepping frame by frame keeps indices exact where seeking by
+            # timestamp would snap to keyframes on many codecs
+            while cap.isOpened():
+                if not cap.grab():
+                    break
+                if frame_idx % sample_rate == 0:
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        break
+                    yield frame_idx, frame
+                frame_idx += 1
+        finally:
+            cap.release()
+        return
+
+    container = _open_video_container(video_path)
+    try:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        for frame_idx, frame in enumerate(container.decode(stream)):
+            if frame_idx % sample_rate == 0:
+                yield frame_idx, frame.to_ndarray(format="bgr24")
+    finally:
+        container.close()
+
+
+def _iter_shot_keyframes(frames, fps: float):
+    """
+    Filter candidate (frame_idx, frame) pairs down to keyframes worth captioning.
+
+    A candidate becomes a keyframe when it looks different from the previous
+    keyframe (a new shot or substantial motion), or when KEYFRAME_MAX_GAP
+    seconds have passed without one. Static footage is captioned sparsely and
+    fast-cut footage densely, instead of at a fixed stride.
+    """
+    last_thumb = None
+    last_ts = None
+    for frame_idx, frame in frames:
+        ts = frame_idx / fps
+        thumb = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (64, 64),
+                           interpolation=cv2.INTER_AREA).astype(np.int16)
+
+        if last_ts is None:
+            is_keyframe = True
+        else:
+            gap = ts - last_ts
+            is_keyframe = gap >= KEYFRAME_MAX_GAP or (
+                gap >= KEYFRAME_MIN_GAP
+                and np.abs(thumb - last_thumb).mean() > SHOT_CHANGE_THRESHOLD
+            )
+
+        if is_keyframe:
+            last_thumb, last_ts = thumb, ts
+            yield frame_idx, frame
 
 
 def analyze_scenes(video_path: str):
@@ -150,29 +579,25 @@ def analyze_scenes(video_path: str):
         fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         duration = frame_count / fps
+        cap.release()
 
         scenes = []
-        frame_idx = 0
 
-        # Analyze keyframes (every 3 seconds for VLM analysis - slower but more detailed)
-        sample_rate = int(fps * 3)
-        total_samples = int(duration / 3)
+        # Analyze keyframes on shot changes (VLM analysis - slower but more detailed)
+        check_rate = max(1, int(fps * KEYFRAME_CHECK_INTERVAL))
 
-        print(f"Analyzing {total_samples} keyframes with vision-language model...", file=sys.stderr)
+        print(f"Analyzing keyframes of {duration:.1f}s video with vision-language model...", file=sys.stderr)
 
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
+        # Sampled (frame_idx, frame) pairs waiting to be captioned together
+        batch = []
 
-            if frame_idx % sample_rate == 0:
-                timestamp = frame_idx / fps
-
-                # Dynamic analysis - generates descriptions
-                analysis = analyze_frame_content(frame, model, processor)
+        def process_batch():
+            # Dynamic analysis - generates descriptions
+            analyses = analyze_frames_batch([frame for _, frame in batch], model, processor)
 
+            for (sample_idx, _), analysis in zip(batch, analyses):
                 scene = {
-                    'timestamp': timestamp,
+                    'timestamp': sample_idx / fps,
                     'type': 'dynamic_moment',
                     'description': analysis['description'],
                     'action_description': analysis['action_description'],
@@ -182,13 +607,29 @@ def analyze_scenes(video_path: str):
 
                 scenes.append(scene)
 
-                progress = int((frame_idx / frame_count) * 100)
+                progress = int((sample_idx / frame_count) * 100)
                 # Show what the model actually sees
                 print(f"Progress: {progress}% - Scene: {analysis['description'][:50]}...", file=sys.stderr)
 
-            frame_idx += 1
+            batch.clear()
+
+            # Hand cached generate() scratch back to the driver between batches
+            if _DEVICE.type == "cuda":
+                torch.cuda.empty_cache()
+
+        candidates = _iter_sampled_frames(video_path, check_rate)
+        for frame_idx, frame in _iter_shot_keyframes(candidates, fps):
+            batch.append((frame_idx, frame))
+            if len(batch) == VLM_BATCH_SIZE:
+                process_batch()
+
+        if batch:
+            process_batch()
+
+        # Release BLIP scratch for GPU work running alongside (Whisper) or after it (AudioCraft)
+        if _DEVICE.type == "cuda":
+            torch.cuda.empty_cache()
 
-        cap.release()
         return scenes
 
     except Exception as e:
@@ -198,6 +639,98 @@ def analyze_scenes(video_path: str):
         return []
 
 
+def _build_automaton(patterns: Dict[str, Any]):
+    """Build an Aho-Corasick automaton mapping each pattern to (pattern, value)."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word, value in patterns.items():
+        automaton.add_word(word, (word, value))
+    automaton.make_automaton()
+    return automaton
+
+
+# Dynamic sound inference rules: (visual keywords, SFX prompt)
+_SOUND_MAPPINGS = [
+    # Movement sounds
+    (['walking', 'person walking', 'man walking', 'woman walking'], 'footsteps'),
+    (['running', 'person running'], 'running footsteps, heavy breathing'),
+    (['jumping', 'leaping'], 'jumping impact, landing sound'),
+    (['dancing', 'moving'], 'shuffling feet, movement'),
+
+    # Transportation
+    (['car', 'vehicle', 'automobile'], 'car engine, vehicle sounds'),
+    (['driving', 'car driving'], 'car engine rumble, road noise'),
+    (['bicycle', 'bike'], 'bicycle pedaling, chain sounds'),
+    (['train'], 'train sounds, railway ambience'),
+    (['airplane', 'plane'], 'airplane engine, flight sounds'),
+
+    # Nature
+    (['tree', 'forest', 'woods'], 'rustling leaves, forest ambience'),
+    (['water', 'lake', 'ocean', 'sea'], 'water sounds, waves'),
+    (['rain', 'raining'], 'rain falling, raindrops'),
+    (['wind', 'windy'], 'wind blowing, air whooshing'),
+    (['bird', 'birds'], 'birds chirping, nature sounds'),
+
+    # Indoor/Objects
+    (['door'], 'door sounds'),
+    (['opening door'], 'door opening, creaking'),
+    (['closing door'], 'door closing, latch'),
+    (['phone', 'smartphone'], 'phone sounds, notification'),
+    (['computer', 'laptop'], 'typing, keyboard clicks'),
+    (['typing'], 'keyboard typing, mechanical clicks'),
+
+    # People
+    (['talking', 'speaking', 'conversation'], 'conversation, people talking'),
+    (['crowd', 'people', 'group'], 'crowd ambience, multiple voices'),
+    (['sitting'], 'subtle movement, chair creak'),
+    (['standing'], 'shuffling, quiet presence'),
+
+    # Environments
+    (['street', 'road'], 'traffic sounds, urban ambience'),
+    (['city', 'urban'], 'city sounds, distant traffic'),
+    (['office'], 'office ambience, computer hum'),
+    (['kitchen'], 'kitchen sounds, utensils'),
+    (['outdoor', 'outside'], 'outdoor ambience, nature'),
+]
+
+
+def _index_mapping_keywords(mappings: List[Tuple[List[str], str]]) -> Dict[str, List[int]]:
+    """Map each keyword to the indices of the mapping rules that list it."""
+    index = {}
+    for idx, (keywords, _) in enumerate(mappings):
+        for keyword in keywords:
+            index.setdefault(keyword, []).append(idx)
+    return index
+
+
+def _build_keyword_regex(index: Dict[str, List[int]]):
+    """
+    Compile keywords into one regex that reports every keyword occurrence.
+
+    The zero-width lookahead matches at every position, and trying longer
+    keywords first finds the longest one starting there. Any shorter keyword
+    starting at the same position is a prefix of it, so each keyword's rules
+    are widened with the rules of its prefixes.
+
+    Returns:
+        (compiled pattern, keyword -> rule indices)
+    """
+    keywords = sorted(index, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+    rules = {
+        keyword: sorted({idx for prefix in index if keyword.startswith(prefix) for idx in index[prefix]})
+        for keyword in keywords
+    }
+    return pattern, rules
+
+
+_SOUND_MAPPINGS_AC = _build_automaton(_index_mapping_keywords(_SOUND_MAPPINGS))
+_SOUND_MAPPINGS_RE, _SOUND_KEYWORD_RULES = _build_keyword_regex(_index_mapping_keywords(_SOUND_MAPPINGS))
+
+
+# Pure in its inputs, and keyframes of the same shot usually repeat captions
+@functools.lru_cache(maxsize=2048)
 def convert_visual_to_audio_description(visual_desc: str, action_desc: str, sound_desc: str) -> str:
     """
     Dynamically convert visual descriptions into audio/SFX prompts.
@@ -221,55 +754,16 @@ def convert_visual_to_audio_description(visual_desc: str, action_desc: str, soun
         # Extract key elements from descriptions
         combined = f"{visual_desc} {action_desc}".lower()
 
-        # Dynamic sound inference rules
-        sound_mappings = [
-            # Movement sounds
-            (['walking', 'person walking', 'man walking', 'woman walking'], 'footsteps'),
-            (['running', 'person running'], 'running footsteps, heavy breathing'),
-            (['jumping', 'leaping'], 'jumping impact, landing sound'),
-            (['dancing', 'moving'], 'shuffling feet, movement'),
-
-            # Transportation
-            (['car', 'vehicle', 'automobile'], 'car engine, vehicle sounds'),
-            (['driving', 'car driving'], 'car engine rumble, road noise'),
-            (['bicycle', 'bike'], 'bicycle pedaling, chain sounds'),
-            (['train'], 'train sounds, railway ambience'),
-            (['airplane', 'plane'], 'airplane engine, flight sounds'),
-
-            # Nature
-            (['tree', 'forest', 'woods'], 'rustling leaves, forest ambience'),
-            (['water', 'lake', 'ocean', 'sea'], 'water sounds, waves'),
-            (['rain', 'raining'], 'rain falling, raindrops'),
-            (['wind', 'windy'], 'wind blowing, air whooshing'),
-            (['bird', 'birds'], 'birds chirping, nature sounds'),
-
-            # Indoor/Objects
-            (['door'], 'door sounds'),
-            (['opening door'], 'door opening, creaking'),
-            (['closing door'], 'door closing, latch'),
-            (['phone', 'smartphone'], 'phone sounds, notification'),
-            (['computer', 'laptop'], 'typing, keyboard clicks'),
-            (['typing'], 'keyboard typing, mechanical clicks'),
-
-            # People
-            (['talking', 'speaking', 'conversation'], 'conversation, people talking'),
-            (['crowd', 'people', 'group'], 'crowd ambience, multiple voices'),
-            (['sitting'], 'subtle movement, chair creak'),
-            (['standing'], 'shuffling, quiet presence'),
-
-            # Environments
-            (['street', 'road'], 'traffic sounds, urban ambience'),
-            (['city', 'urban'], 'city sounds, distant traffic'),
-            (['office'], 'office ambience, computer hum'),
-            (['kitchen'], 'kitchen sounds, utensils'),
-            (['outdoor', 'outside'], 'outdoor ambience, nature'),
-        ]
-
-        # Find matching sound descriptions
-        matched_sounds = []
-        for keywords, sound in sound_mappings:
-            if any(keyword in combined for keyword in keywords):
-                matched_sounds.append(sound)
+        # Find matching sound descriptions, in rule order. One pass over the
+        # text finds every keyword of every rule
+        matched_rules = set()
+        if _SOUND_MAPPINGS_AC is None:
+            for match in _SOUND_MAPPINGS_RE.finditer(combined):
+                matched_rules.update(_SOUND_KEYWORD_RULES[match.group(1)])
+        else:
+            for _, (_, rules) in _SOUND_MAPPINGS_AC.iter(combined):
+                matched_rules.update(rules)
+        matched_sounds = [_SOUND_MAPPINGS[idx][1] for idx in sorted(matched_rules)]
 
         # Combine matched sounds or use visual description as fallback
         if matched_sounds:
@@ -281,6 +775,48 @@ def convert_visual_to_audio_description(visual_desc: str, action_desc: str, soun
     return base_prompt
 
 
+# Sound words mentioned in dialogue and the SFX they imply
+_SOUND_WORDS = {
+    'knock': 'knocking sound',
+    'bang': 'loud bang, impact',
+    'crash': 'crashing sound, collision',
+    'splash': 'water splash',
+    'ring': 'ringing sound',
+    'beep': 'electronic beep',
+    'alarm': 'alarm sound',
+    'click': 'clicking sound',
+    'pop': 'popping sound',
+    'whoosh': 'whooshing sound',
+    'buzz': 'buzzing sound',
+    'hum': 'humming sound',
+    'whistle': 'whistling sound',
+    'slam': 'door slamming',
+    'footsteps': 'footstep sounds',
+}
+
+
+_SOUND_WORDS_AC = _build_automaton(_SOUND_WORDS)
+
+
+def _find_sound_words(text_lower: str) -> List[Tuple[str, str]]:
+    """Return (word, sfx) pairs mentioned in the text, ordered by first mention."""
+    if _SOUND_WORDS_AC is None:
+        # Rank by where each word's first mention ends, as the automaton reports them
+        mentions = []
+        for word, sfx in _SOUND_WORDS.items():
+            pos = text_lower.find(word)
+            if pos >= 0:
+                mentions.append((pos + len(word), word, sfx))
+        mentions.sort(key=lambda mention: mention[0])
+        return [(word, sfx) for _, word, sfx in mentions]
+
+    # One pass over the text finds every keyword; keep the first hit per word
+    found = {}
+    for _, (word, sfx) in _SOUND_WORDS_AC.iter(text_lower):
+        found.setdefault(word, sfx)
+    return list(found.items())
+
+
 def suggest_sfx(scenes: List[Dict], transcription: List[Dict]) -> List[Dict]:
     """
     DYNAMICALLY suggest sound effects based on natural language understanding.
@@ -294,9 +830,21 @@ def suggest_sfx(scenes: List[Dict], transcription: List[Dict]) -> List[Dict]:
         List of dynamically generated SFX suggestions
     """
     suggestions = []
+    # Sorted timestamps of suggestions so far, for O(log N) proximity checks
+    suggestion_ts = []
+
+    def add_suggestion(suggestion):
+        suggestions.append(suggestion)
+        bisect.insort(suggestion_ts, suggestion['timestamp'])
+
+    def has_suggestion_near(timestamp, window):
+        # The closest existing timestamps sit on either side of the insertion point
+        idx = bisect.bisect_left(suggestion_ts, timestamp)
+        return any(abs(suggestion_ts[i] - timestamp) < window
+                   for i in (idx - 1, idx) if 0 <= i < len(suggestion_ts))
 
-    # Process each scene with dynamic understanding
-    for scene in scenes:
+    def add_scene_suggestion(scene):
+        """Process a scene with dynamic understanding."""
         if scene.get('type') == 'dynamic_moment':
             timestamp = scene['timestamp']
             visual_desc = scene.get('description', '')
@@ -308,7 +856,7 @@ def suggest_sfx(scenes: List[Dict], transcription: List[Dict]) -> List[Dict]:
 
             # Only add if we generated something meaningful
             if sfx_prompt and len(sfx_prompt) > 5:
-                suggestions.append({
+                add_suggestion({
                     'timestamp': timestamp,
                     'prompt': sfx_prompt,
                     'reason': f'Scene: {visual_desc[:60]}...' if len(visual_desc) > 60 else f'Scene: {visual_desc}',
@@ -317,87 +865,79 @@ def suggest_sfx(scenes: List[Dict], transcription: List[Dict]) -> List[Dict]:
                     'action_context': action_desc
                 })
 
+    # Scenes and segments are both timestamp-ordered, so a single merge-style
+    # sweep keeps a sliding window [lo, hi) of scenes near the current segment.
+    # Scenes are emitted as they enter the window, so each is visited once and
+    # is already in suggestions before any segment within 2s of it.
+    ordered_scenes = sorted(scenes, key=lambda s: s['timestamp'])
+    ordered_segments = sorted(transcription, key=lambda s: s['start'])
+    lo = hi = 0
+
     # Enhance with transcription - dynamic phrase detection
-    for segment in transcription:
+    for segment in ordered_segments:
         text = segment['text']
         text_lower = text.lower()
         timestamp = segment['start']
 
-        # Dynamic sound word detection
-        sound_words = {
-            'knock': 'knocking sound',
-            'bang': 'loud bang, impact',
-            'crash': 'crashing sound, collision',
-            'splash': 'water splash',
-            'ring': 'ringing sound',
-            'beep': 'electronic beep',
-            'alarm': 'alarm sound',
-            'click': 'clicking sound',
-            'pop': 'popping sound',
-            'whoosh': 'whooshing sound',
-            'buzz': 'buzzing sound',
-            'hum': 'humming sound',
-            'whistle': 'whistling sound',
-            'slam': 'door slamming',
-            'footsteps': 'footstep sounds',
-        }
+        # Slide the window to scenes strictly within 2s of the segment start
+        while hi < len(ordered_scenes) and ordered_scenes[hi]['timestamp'] < timestamp + 2.0:
+            add_scene_suggestion(ordered_scenes[hi])
+            hi += 1
+        while lo < hi and ordered_scenes[lo]['timestamp'] <= timestamp - 2.0:
+            lo += 1
 
-        # Check for explicit sound mentions
-        for word, sfx in sound_words.items():
-            if word in text_lower:
-                # Find nearby scene for context
-                nearby_scene = next((s for s in scenes if abs(s['timestamp'] - timestamp) < 2.0), None)
-                context = nearby_scene.get('description', '') if nearby_scene else text
+        # Use nearby scene for context
+        context = ordered_scenes[lo].get('description', '') if lo < hi else text
 
-                suggestions.append({
-                    'timestamp': timestamp,
-                    'prompt': sfx,
-                    'reason': f'Mentioned "{word}" in dialogue: "{text[:50]}..."',
-                    'confidence': 0.9,
-                    'dialogue_context': text,
-                    'visual_context': context
-                })
+        # Check for explicit sound mentions
+        for word, sfx in _find_sound_words(text_lower):
+            add_suggestion({
+                'timestamp': timestamp,
+                'prompt': sfx,
+                'reason': f'Mentioned "{word}" in dialogue: "{text[:50]}..."',
+                'confidence': 0.9,
+                'dialogue_context': text,
+                'visual_context': context
+            })
 
-        # Dynamic action phrase detection (no hardcoded combos)
-        # Split into words and look for action patterns
-        words = text_lower.split()
-        for i, word in enumerate(words):
-            # Object + action patterns
-            if i < len(words) - 1:
+        # Dynamic action phrase detection (no hardcoded combos).
+        # Once one pair is added the segment's timestamp is covered, so only
+        # the first plausible pair can be used - and only if nothing is
+        # already suggested within 0.5s.
+        if not has_suggestion_near(timestamp, 0.5):
+            # Split into words and look for object + action patterns
+            words = text_lower.split()
+            for obj, action in zip(words, words[1:]):
                 # "door opens", "car starts", etc.
-                obj = word
-                action = words[i + 1]
-
-                # Generate dynamic SFX from object-action pair
-                sfx_prompt = f"{obj} {action} sound"
-
                 # Only add if it seems like a real object-action
-                if any(char.isalpha() for char in obj) and len(obj) > 2:
-                    # Verify this isn't already covered
-                    if not any(abs(s['timestamp'] - timestamp) < 0.5 for s in suggestions):
-                        suggestions.append({
-                            'timestamp': timestamp,
-                            'prompt': sfx_prompt,
-                            'reason': f'Action mentioned: "{obj} {action}"',
-                            'confidence': 0.6,
-                            'dialogue_context': text
-                        })
+                if len(obj) > 2 and any(char.isalpha() for char in obj):
+                    # Generate dynamic SFX from object-action pair
+                    add_suggestion({
+                        'timestamp': timestamp,
+                        'prompt': f"{obj} {action} sound",
+                        'reason': f'Action mentioned: "{obj} {action}"',
+                        'confidence': 0.6,
+                        'dialogue_context': text
+                    })
+                    break
+
+    # Scenes after the last segment
+    for scene in ordered_scenes[hi:]:
+        add_scene_suggestion(scene)
 
     # Sort and deduplicate
     suggestions.sort(key=lambda x: x['timestamp'])
 
-    # Smart deduplication - keep highest confidence for similar timestamps
+    # Smart deduplication - keep highest confidence for similar timestamps.
+    # Kept suggestions stay sorted and at least 1.5s apart, so only the last
+    # one can be within 1.5s of the next candidate: a single linear sweep.
     unique_suggestions = []
     for suggestion in suggestions:
         # Check if there's already a similar suggestion nearby
-        similar = next((s for s in unique_suggestions
-                       if abs(s['timestamp'] - suggestion['timestamp']) < 1.5), None)
-
-        if similar:
+        if unique_suggestions and suggestion['timestamp'] - unique_suggestions[-1]['timestamp'] < 1.5:
             # Keep the one with higher confidence
-            if suggestion['confidence'] > similar['confidence']:
-                unique_suggestions.remove(similar)
-                unique_suggestions.append(suggestion)
+            if suggestion['confidence'] > unique_suggestions[-1]['confidence']:
+                unique_suggestions[-1] = suggestion
         else:
             unique_suggestions.append(suggestion)
 
@@ -407,26 +947,35 @@ def suggest_sfx(scenes: List[Dict], transcription: List[Dict]) -> List[Dict]:
     return sorted(unique_suggestions, key=lambda x: x['timestamp'])
 
 
-def analyze_video(video_path: str, audio_path: str):
+def analyze_video(video_path: str, audio_path: str, scene_executor: Optional[ThreadPoolExecutor] = None):
     """
     Perform complete video analysis.
 
     Args:
         video_path: Path to video file
         audio_path: Path to extracted audio file
+        scene_executor: Optional long-lived single-thread executor to run scene
+            analysis on. torch.compile records CUDA graphs per thread, so
+            reusing one thread keeps BLIP's warmed-up graphs across calls
 
     Returns:
         Complete analysis results as dict
     """
     print("Analyzing video...", file=sys.stderr)
 
-    # Transcribe audio
-    print("Transcribing audio...", file=sys.stderr)
-    transcription = transcribe_audio(audio_path)
+    # Transcription and scene analysis are independent, and both spend their
+    # time in native code that releases the GIL, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Transcribe audio
+        print("Transcribing audio...", file=sys.stderr)
+        transcription_future = executor.submit(transcribe_audio, audio_path)
+
+        # Analyze scenes
+        print("Analyzing scenes...", file=sys.stderr)
+        scenes_future = (scene_executor or executor).submit(analyze_scenes, video_path)
 
-    # Analyze scenes
-    print("Analyzing scenes...", file=sys.stderr)
-    scenes = analyze_scenes(video_path)
+        transcription = transcription_future.result()
+        scenes = scenes_future.result()
 
     # Generate SFX suggestions
     print("Generating SFX suggestions...", file=sys.stderr)
@@ -442,13 +991,59 @@ def analyze_video(video_path: str, audio_path: str):
     return analysis
 
 
+def serve():
+    """
+    Analyze a stream of videos in one long-lived process.
+
+    Loads the models once, then reads newline-delimited JSON jobs of the form
+    {"video": ..., "audio": ...} from stdin and writes one JSON result per
+    line to stdout, so callers do not pay model startup for every video.
+    Failed jobs produce {"error": ...} instead of ending the loop.
+    """
+    # Compiled BLIP's CUDA graphs are thread-local, so warm it up on the one
+    # thread that then runs scene analysis for every job
+    with ThreadPoolExecutor(max_workers=1) as scene_executor:
+        scene_executor.submit(get_vlm_model, compile_model=True).result()
+        get_whisper_model()
+        print("Ready for analysis jobs", file=sys.stderr)
+
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                job = json.loads(line)
+                video_path, audio_path = job['video'], job['audio']
+                if not Path(video_path).exists():
+                    raise FileNotFoundError(f"Video file not found: {video_path}")
+                if not Path(audio_path).exists():
+                    raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+                result = analyze_video(video_path, audio_path, scene_executor)
+            except Exception as e:
+                print(f"Error analyzing video: {str(e)}", file=sys.stderr)
+                result = {'error': str(e)}
+
+            print(json.dumps(result), flush=True)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Analyze video content')
-    parser.add_argument('--video', required=True, help='Path to video file')
-    parser.add_argument('--audio', required=True, help='Path to extracted audio file')
+    parser.add_argument('--video', help='Path to video file')
+    parser.add_argument('--audio', help='Path to extracted audio file')
+    parser.add_argument('--serve', action='store_true',
+                        help='Keep models loaded and read JSON jobs from stdin, one per line')
 
     args = parser.parse_args()
 
+    if args.serve:
+        serve()
+        return
+
+    if not args.video or not args.audio:
+        parser.error('--video and --audio are required unless --serve is given')
+
     # Validate inputs
     if not Path(args.video).exists():
         print(f"Error: Video file not found: {args.video}", file=sys.stderr)